@@ -1,7 +1,11 @@
 #! /usr/local/bin/python3.8
 
+import functools
+
 import matplotlib.pyplot as plt
+import matplotlib.ticker as ticker
 import numpy as np
+import scipy.fft
 import scipy.signal as sig
 
 plt.style.use('classic')
@@ -9,9 +13,67 @@ plt.style.use('seaborn-poster')
 
 title_font = {'fontname' : 'DejaVu Serif'}
 
+# ticks at multiples of 3.14 / 4 (shared by the frequency axes and the phase axis)
+pi_ticks = [i * np.pi / 4 for i in range(-4, 5)]
+pi_labels = [r'$-\pi$', r'$-\dfrac{3\pi}{4}$', r'$-\dfrac{\pi}{2}$', r'$-\dfrac{\pi}{4}$', r'$0$', r'$\dfrac{\pi}{4}$', r'$\dfrac{\pi}{2}$', r'$\dfrac{3\pi}{4}$', r'$\pi$']
+
+################################################################################
+
+def tick_formatter():
+	'''
+	Create a tick formatter which displays tick values using LaTeX.
+	Unlike rewriting the tick labels, this does not require the figure to be drawn first.
+
+	Returns:
+		formatter to be set as the major formatter of an axis
+	'''
+
+	return ticker.FuncFormatter(lambda value, position: r'${:g}$'.format(value))
+
+################################################################################
+
+def set_frequency_axis(ax, sampling_rate):
+	'''
+	Set the ticks, tick labels and label of the horizontal axis of a frequency domain plot.
+
+	Args:
+		ax: axes whose horizontal axis represents 'omega'
+		sampling_rate: sampling rate of the sequence (if it is `None', 'omega' is shown instead of frequency)
+	'''
+
+	if sampling_rate is None:
+		ax.set_xticklabels(pi_labels)
+		ax.set_xticks(pi_ticks)
+		ax.set_xlabel(r'$\omega$')
+	else:
+		ax.set_xticklabels([f'${i * sampling_rate / 20:.2f}$' for i in range(-10, 11)])
+		ax.set_xticks([i * np.pi / 10 for i in range(-10, 11)])
+		ax.set_xlabel(r'$f/$Hz', **title_font)
+
+################################################################################
+
+@functools.lru_cache(maxsize = 8)
+def frequency_grid(n_points):
+	'''
+	Generate the uniformly spaced frequencies at which the DTFT is sampled.
+	These depend only on the number of points, so they are computed once and then reused.
+	The array is made read-only, because every caller receives the same object.
+
+	Args:
+		n_points: number of frequencies
+
+	Returns:
+		frequencies from -3.14 (included) to 3.14 (excluded), arranged like the output of 'np.fft.fftshift'
+	'''
+
+	omega = 2 * np.pi * np.fft.fftshift(np.fft.fftfreq(n_points))
+	omega.flags.writeable = False
+
+	return omega
+
 ################################################################################
 
-def discrete_time_fourier_transform(time_domain_sequence):
+def discrete_time_fourier_transform(time_domain_sequence, n_points = None):
 	'''
 	Calculate the discrete-time Fourier transform (DTFT) of the input sequence.
 	In theory, the DTFT of a sequence is continuous. Which cannot be represented by a computer.
@@ -25,6 +87,7 @@ def discrete_time_fourier_transform(time_domain_sequence):
 
 	Args:
 		time_domain_sequence: discrete sequence to be transformed
+		n_points: number of frequencies at which the DTFT is calculated (default: a power of 2, see below)
 
 	Returns:
 		DTFT of input sequence
@@ -35,15 +98,74 @@ def discrete_time_fourier_transform(time_domain_sequence):
 	# which is why 'n_points' should be large (to imitate continuous variable behaviour)
 	# if 'n_points' equals 'len(time_domain_sequence)', the final output will be same as FFT
 	# because the number of elements in the input and output sequences will be the same
-	n_points = 1000
-	omega = np.linspace(-np.pi, np.pi, n_points)
-
-	# twiddle factor matrix
-	# in case of FFT, it is a square matrix because 'n_points' equals 'len(time_domain_sequence)'
-	# not in this case, though
-	# DTFT is calculated by a matrix multiplication, just like DFT matrix multiplication
-	twiddle = [[np.exp(-1j * omega * n) for n in range(len(time_domain_sequence))] for omega in np.linspace(-np.pi, np.pi, n_points)]
-	frequency_domain_signal = np.array(twiddle) @ np.array(time_domain_sequence)
+	# the points are spaced the way FFT spaces them, so 3.14 itself is not included
+	# by default, use the smallest power of 2 which is at least 1024 and at least 'len(time_domain_sequence)'
+	# FFT is fastest when the number of points is a power of 2, and then no folding is required (see below)
+	if n_points is None:
+		n_points = 1 << max(10, (len(time_domain_sequence) - 1).bit_length())
+	omega = frequency_grid(n_points)
+
+	# single precision is plenty for plotting, and halves the memory traffic
+	# unlike 'np.fft', 'scipy.fft' does not upcast single precision input to double precision
+	single_precision = np.complex64 if np.iscomplexobj(time_domain_sequence) else np.float32
+	time_domain_sequence = np.asarray(time_domain_sequence, dtype = single_precision)
+
+	# if the sequence is real, the DTFT at '-omega' is the complex conjugate of that at 'omega'
+	# hence, only the non-negative frequencies (0 to 3.14, both included) need to be calculated
+	is_real = not np.iscomplexobj(time_domain_sequence)
+	frequencies = -omega[n_points // 2 :: -1] if is_real else omega
+
+	# the DTFT is a polynomial in 'z', where 'z' is the complex exponential of '-omega'
+	# if the sequence is short, evaluating this polynomial using Horner's method is cheaper than an FFT
+	# because only 'n_points' complex exponentials are required
+	if len(time_domain_sequence) <= np.log2(n_points):
+		# write the cosine and negative sine directly into the real and imaginary parts of 'z'
+		# instead of evaluating a complex exponential in double precision and then converting it
+		z = np.empty(len(frequencies), dtype = np.complex64)
+		np.cos(frequencies, out = z.real)
+		np.sin(frequencies, out = z.imag)
+		np.negative(z.imag, out = z.imag)
+
+		# Horner's method starts from the last element of the sequence
+		# so starting with it (rather than with zeros) saves one multiplication and one addition per frequency
+		# for a four-element filter, this leaves three of each, and no matrix at all
+		last = time_domain_sequence[-1] if len(time_domain_sequence) > 0 else 0
+		frequency_domain_signal = np.full(len(frequencies), last, dtype = np.complex64)
+
+		# every element of the sequence requires one pass over the frequencies
+		# do all these passes over one block of frequencies before moving to the next
+		# so that the block stays in the cache instead of being fetched from memory again and again
+		block_size = 16384
+		for start in range(0, len(frequencies), block_size):
+			z_block = z[start : start + block_size]
+			block = frequency_domain_signal[start : start + block_size]
+			for x in time_domain_sequence[-2 :: -1]:
+				block *= z_block
+				block += x
+
+	# sampling the DTFT at 'n_points' uniformly spaced frequencies is exactly what an FFT of that many points does
+	# a shorter sequence is zero-padded by FFT itself
+	# a longer sequence must first be folded (wrapped around) onto 'n_points' samples
+	# because the twiddle factor at sample index 'n' is the same as that at 'n + n_points'
+	else:
+		# the complete folds are summed through a view of the input, so it is not copied into a zero-padded array
+		if len(time_domain_sequence) > n_points:
+			n_folds, n_remaining = divmod(len(time_domain_sequence), n_points)
+			folded = time_domain_sequence[: n_folds * n_points].reshape(n_folds, n_points).sum(axis = 0)
+			folded[: n_remaining] += time_domain_sequence[n_folds * n_points :]
+			time_domain_sequence = folded
+
+		# FFT output starts at zero frequency, whereas 'omega' starts at -3.14
+		# real FFT calculates only the non-negative frequencies, so it is already in the required order
+		if is_real:
+			frequency_domain_signal = scipy.fft.rfft(time_domain_sequence, n = n_points)
+		else:
+			frequency_domain_signal = scipy.fft.fftshift(scipy.fft.fft(time_domain_sequence, n = n_points))
+
+	# obtain the negative frequencies (excluding 0, and including -3.14 only if 'n_points' is even) by symmetry
+	if is_real:
+		negative = np.conj(frequency_domain_signal[n_points // 2 : 0 : -1])
+		frequency_domain_signal = np.concatenate((negative, frequency_domain_signal[: n_points - n_points // 2]))
 
 	return omega, frequency_domain_signal
 
@@ -65,8 +187,13 @@ if __name__ == '__main__':
 
 	# output signal
 	omega, frequency_domain_signal = discrete_time_fourier_transform(time_domain_sequence)
+
+	# magnitude and phase are calculated once, and reused for normalisation and plotting
+	# normalisation scales the magnitude by a positive number, so it does not change the phase
+	magnitude = np.hypot(frequency_domain_signal.real, frequency_domain_signal.imag)
+	phase = np.arctan2(frequency_domain_signal.imag, frequency_domain_signal.real)
 	if normalise:
-		frequency_domain_signal /= np.amax(np.abs(frequency_domain_signal))
+		magnitude /= np.amax(magnitude)
 
 	########################################
 
@@ -86,14 +213,13 @@ if __name__ == '__main__':
 	ax.set_xlim(0, h_length - 1)
 	ax.set_ylim(-1, 1)
 	ax.set_yticks(np.linspace(-1, 1, 11))
-	fig.canvas.draw()
 
 	# fill text
 	ax.set_title('Time Domain', **title_font)
 	ax.set_xlabel(r'$n$')
 	ax.set_ylabel(r'$x[n]$')
-	ax.set_xticklabels([r'${}$'.format(t.get_text()) for t in ax.get_xticklabels()])
-	ax.set_yticklabels([r'${}$'.format(t.get_text()) for t in ax.get_yticklabels()])
+	ax.xaxis.set_major_formatter(tick_formatter())
+	ax.yaxis.set_major_formatter(tick_formatter())
 
 	fig.tight_layout(pad = 1)
 
@@ -103,7 +229,7 @@ if __name__ == '__main__':
 	fig = plt.figure()
 	fig.canvas.set_window_title('Discrete Fourier Transform')
 	ax = fig.add_subplot(1, 1, 1)
-	ax.plot(omega, np.abs(frequency_domain_signal), 'r-', linewidth = 0.8)
+	ax.plot(omega, magnitude, 'r-', linewidth = 0.8)
 
 	# appearance settings
 	ax.axhline(linewidth = 1.6, color = 'k')
@@ -114,20 +240,12 @@ if __name__ == '__main__':
 	ax.set_xlim(-np.pi, np.pi)
 	if normalise:
 		ax.set_yticks(np.linspace(0, 1, 11))
-	fig.canvas.draw()
 
 	# fill text
 	ax.set_title('Frequency Domain: Magnitude Plot', **title_font)
-	if sampling_rate is None:
-		ax.set_xticklabels([r'$-\pi$', r'$-\dfrac{3\pi}{4}$', r'$-\dfrac{\pi}{2}$', r'$-\dfrac{\pi}{4}$', r'$0$', r'$\dfrac{\pi}{4}$', r'$\dfrac{\pi}{2}$', r'$\dfrac{3\pi}{4}$', r'$\pi$'])
-		ax.set_xticks([i * np.pi / 4 for i in range(-4, 5)])
-		ax.set_xlabel(r'$\omega$')
-	else:
-		ax.set_xticklabels([f'${i * sampling_rate / 20:.2f}$' for i in range(-10, 11)])
-		ax.set_xticks([i * np.pi / 10 for i in range(-10, 11)])
-		ax.set_xlabel(r'$f/$Hz', **title_font)
+	set_frequency_axis(ax, sampling_rate)
 	ax.set_ylabel(r'$|X(e^{j\omega})|$')
-	ax.set_yticklabels([r'${}$'.format(t.get_text()) for t in ax.get_yticklabels()])
+	ax.yaxis.set_major_formatter(tick_formatter())
 
 	fig.tight_layout(pad = 1)
 
@@ -137,7 +255,7 @@ if __name__ == '__main__':
 	fig = plt.figure()
 	fig.canvas.set_window_title('Discrete Fourier Transform')
 	ax = fig.add_subplot(1, 1, 1)
-	ax.plot(omega, np.angle(frequency_domain_signal), 'r-', linewidth = 0.8)
+	ax.plot(omega, phase, 'r-', linewidth = 0.8)
 
 	# appearance settings
 	ax.axhline(linewidth = 1.6, color = 'k')
@@ -147,20 +265,12 @@ if __name__ == '__main__':
 	ax.minorticks_on()
 	ax.set_xlim(-np.pi, np.pi)
 	ax.set_ylim(-np.pi, np.pi)
-	fig.canvas.draw()
 
 	# fill text
 	ax.set_title('Frequency Domain: Phase Plot', **title_font)
-	if sampling_rate is None:
-		ax.set_xticklabels([r'$-\pi$', r'$-\dfrac{3\pi}{4}$', r'$-\dfrac{\pi}{2}$', r'$-\dfrac{\pi}{4}$', r'$0$', r'$\dfrac{\pi}{4}$', r'$\dfrac{\pi}{2}$', r'$\dfrac{3\pi}{4}$', r'$\pi$'])
-		ax.set_xticks([i * np.pi / 4 for i in range(-4, 5)])
-		ax.set_xlabel(r'$\omega$')
-	else:
-		ax.set_xticklabels([f'${i * sampling_rate / 20:.2f}$' for i in range(-10, 11)])
-		ax.set_xticks([i * np.pi / 10 for i in range(-10, 11)])
-		ax.set_xlabel(r'$f/$Hz', **title_font)
-	ax.set_yticklabels([r'$-\pi$', r'$-\dfrac{3\pi}{4}$', r'$-\dfrac{\pi}{2}$', r'$-\dfrac{\pi}{4}$', r'$0$', r'$\dfrac{\pi}{4}$', r'$\dfrac{\pi}{2}$', r'$\dfrac{3\pi}{4}$', r'$\pi$'])
-	ax.set_yticks([i * np.pi / 4 for i in range(-4, 5)])
+	set_frequency_axis(ax, sampling_rate)
+	ax.set_yticklabels(pi_labels)
+	ax.set_yticks(pi_ticks)
 
 	fig.tight_layout(pad = 1)
 